@@ -4,17 +4,35 @@
 # A simple console-based single-player blackjack game.
 # Simply type "h" (for hit) or "s" (for stand) in the console to interact with the dealer. If you stand,
 #   you can see the dealer getting cards from the deck until the value of his hand is 17 or higher.
+# Run with "--fast" to skip the pause between the dealer's cards.
 # Enjoy!
 
 
 # import libraries
-from random import shuffle  # to shuffle the deck
+from random import Random    # random number generator used to shuffle the deck
+from array import array     # compact storage for the cards in a hand
+import sys                   # to write the game status in one call
 import time                  # to have intervals between dealer drawing (for suspense)
 
 # initialize global variables regarding cards
-values = {'A':11, '2':2, '3':3, '4':4, '5':5, '6':6, '7':7, '8':8, '9':9, '10':10, 'J':10, 'Q':10, 'K':10}
-ranks = ['A', '2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K']
-suits = ['Clubs', 'Spade', 'Diamond', 'Hearts']
+# the value of a rank is found at the same index in values as in ranks
+ranks = ('A', '2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K')
+values = (11, 2, 3, 4, 5, 6, 7, 8, 9, 10, 10, 10, 10)
+suits = ('Clubs', 'Spade', 'Diamond', 'Hearts')
+
+# cards are represented by an id from 0 to 51. The rank of a card is
+#   ranks[id // 4] and its suit is suits[id % 4]. CARD_TABLE holds the
+#   (rank, suit, value) of every card id, while CARD_VALUE and CARD_IS_ACE
+#   hold just the value and whether the card is an ace as flat 52-byte
+#   strings, shared by the game and simulate. CARD_DISPLAY
+#   holds the [rank, suit] pair printed for each card.
+NUM_CARDS = len(ranks) * len(suits)
+NUM_SUITS = len(suits)
+CARD_TABLE = tuple((ranks[i // NUM_SUITS], suits[i % NUM_SUITS], values[i // NUM_SUITS])
+                   for i in range(NUM_CARDS))
+CARD_VALUE = bytes(value for _, _, value in CARD_TABLE)
+CARD_IS_ACE = bytes(rank == 'A' for rank, _, _ in CARD_TABLE)
+CARD_DISPLAY = tuple([rank, suit] for rank, suit, _ in CARD_TABLE)
 
 # used to determine if game is over
 PLAYER_IN = 0       # game is not over
@@ -25,47 +43,81 @@ BLACKJACK = 2       # player blackjack, dealer needs to draw cards
 BLACKJACK_VAL = 21      # value of hand for a blackjack
 ZERO_SCORE = 0          # hand with no value
 ACE_HARD_TO_SOFT = 10   # translation value from soft value to hard value ace (11 - 1)
+DEALER_STAND_VAL = 17   # dealer stops drawing once the hand reaches this value
 WIN = 1
 TIE = 0
 LOSE = -1
 
-class Card:
-    '''The Card class is used to represent individual cards.
-        It contains the rank, value, and suit of a card.'''
-    def __init__(self, rank, suit):
-        self.rank = rank
-        self.value = values[rank]
-        self.suit = suit
-
-    # returns rank of a given card
-    def get_rank(self):
-        return self.rank
-
-    # returns suit of a given card
-    def get_suit(self):
-        return self.suit
-
-    # returns the value of a given card. The Ace was chosen to have
-    #   a value of 11.
-    def get_value(self):
-        return self.value
+# message and result of a finished game, keyed by whether the player
+#   busted, whether the dealer busted, and how the player's value
+#   compares to the dealer's: -1 if lower, 0 if tied, 1 if higher,
+#   and 2 if higher with a blackjack. Equal values are a tie, including
+#   when both hands are at BLACKJACK_VAL.
+PLAYER_BUSTED_OUTCOME = ("Player Busted! You lose!", LOSE)
+OUTCOMES = {
+    # player is busted, dealer score doesn't matter
+    (True, False, 1): PLAYER_BUSTED_OUTCOME,
+    (True, True, -1): PLAYER_BUSTED_OUTCOME,
+    (True, True, 0): PLAYER_BUSTED_OUTCOME,
+    (True, True, 1): PLAYER_BUSTED_OUTCOME,
+    # player is good but dealer busts
+    (False, True, -1): ("Dealer Busted! You win!", WIN),
+    # player and dealer are good
+    (False, False, -1): ("Dealer value higher! You lose!", LOSE),
+    (False, False, 0): ("Tie!", TIE),
+    (False, False, 1): ("Player value higher! You win!", WIN),
+    (False, False, 2): ("Blackjack! You win!", WIN),
+}
+
+# returns the hard value of a hand from its total value, with every ace
+#   counted as 11, and its number of aces. Only one ace can count as 11,
+#   and it drops to 1 as well if the hand would otherwise exceed
+#   BLACKJACK_VAL. The cases are picked with arithmetic on booleans
+#   rather than branches, so this also works on NumPy arrays of values.
+def hard_value(value, numAce):
+    hasAce = numAce > 0
+    hard = value - (numAce - hasAce) * ACE_HARD_TO_SOFT
+    return hard - ACE_HARD_TO_SOFT * (hasAce & (hard > BLACKJACK_VAL))
+
+# deals cards from the deck until the value of the hand reaches
+#   DEALER_STAND_VAL, scoring aces with hard_value. The hand is given as
+#   its total value and number of aces, so the loop only keeps integers
+#   and doesn't print or wait between draws.
+# Returns the list of card ids that were dealt, in order.
+def draw_until_17(deck, value, numAce):
+    drawn = []
+    while hard_value(value, numAce) < DEALER_STAND_VAL:
+        card = deck.deal_card()
+        drawn.append(card)
+        value += CARD_VALUE[card]
+        numAce += CARD_IS_ACE[card]
+    return drawn
 
 class Hand:
     '''The Hand class is used to represent the hand of dealer or
-        player. It contains the list of cards held in a hand,
-        the number of aces within the hand, and the hard value.'''
+        player. It contains the array of card ids held in a hand,
+        the number of aces within the hand, the total value with
+        every ace counted as 11, and the cached result of get_value.'''
     def __init__(self):
-        self.hand = []
+        self.hand = array('b')
+        self.numAce = 0
+        self.value = 0
+        self._cached = None
+
+    # empties the hand so it can be reused for another round
+    def reset(self):
+        del self.hand[:]
         self.numAce = 0
         self.value = 0
+        self._cached = None
 
-    # adds a Card object to the list. Each time an ace is added,
+    # adds a card id to the hand. Each time an ace is added,
     #   the counter value increments.
     def add_card(self, card):
         self.hand.append(card)
-        self.value += card.get_value()
-        if card.get_rank() == 'A':
-            self.numAce += 1
+        self.value += CARD_VALUE[card]
+        self.numAce += CARD_IS_ACE[card]
+        self._cached = None
 
     # returns the point value of a hand. Notice that the code
     #   handles the case of one or multiple Aces in the hand.
@@ -77,47 +129,81 @@ class Hand:
     #   hard value. If the hard value has exceeded BLACKJACK_VAL, however,
     #   the first tuple element will return 0 and the second tuple element
     #   will return the soft value.
+    # The result is cached until the next card is added to the hand.
     def get_value(self):
-        # if there is an ace, return a soft value and hard value unless
-        #   the hard value has exceeded BLACKJACK_VAL. In this case, we just
-        #   return the soft value.
-        if self.numAce:
-            self.value -= (self.numAce - 1) * ACE_HARD_TO_SOFT
-            if self.value > BLACKJACK_VAL:
-                return ZERO_SCORE, self.value - ACE_HARD_TO_SOFT
-            else:
-                return self.value - ACE_HARD_TO_SOFT, self.value
-
-        # if there is no ace, simply return the value
-        return ZERO_SCORE, self.value
-
-    # returns the hand in a form that can be printed to the console
+        if self._cached is not None:
+            return self._cached
+
+        # if there is an ace still counting as 11, also return the soft
+        #   value. That is the case when less than 10 per ace was taken
+        #   off the total value to get the hard value.
+        hard = hard_value(self.value, self.numAce)
+        softOk = self.value - hard < self.numAce * ACE_HARD_TO_SOFT
+        self._cached = (hard - ACE_HARD_TO_SOFT) * softOk, hard
+        return self._cached
+
+    # returns just the hard value from get_value, which is all that is
+    #   needed to check for a blackjack or a bust. Doesn't build the
+    #   soft value or the tuple.
+    def hard_value(self):
+        if self._cached is not None:
+            return self._cached[1]
+        return hard_value(self.value, self.numAce)
+
+    # returns the hand in a form that can be printed to the console.
+    #   The [rank, suit] pairs are shared between calls and shouldn't
+    #   be modified.
     def get_hand(self):
-        return [[card.get_rank(), card.get_suit()] for card in self.hand]
+        return [CARD_DISPLAY[card] for card in self.hand]
 
 class Deck:
     '''The Deck class is used to represent the pack of 52 cards.
-        It contains the deck itself.'''
-    def __init__(self):
-        self.deck = [Card(rank, suit) for rank in ranks for suit in suits]
-
-    # shuffle the deck using the shuffle library from random library
+        It contains the card ids of the deck as a 52-byte buffer, a
+        memoryview over that buffer used for dealing, the position of
+        the top card, and the random number generator used to shuffle.
+        Giving a seed makes the order of the shuffles repeatable.'''
+    def __init__(self, seed=None):
+        self.deck = bytearray(range(NUM_CARDS))
+        self._mv = memoryview(self.deck)
+        self.top = NUM_CARDS
+        self._rng = Random(seed)
+
+    # puts every dealt card back in the deck. The cards keep their
+    #   order until the deck is shuffled again.
+    def reset(self):
+        self.top = NUM_CARDS
+
+    # shuffle the deck using the deck's own random number generator.
+    #   Every card id is still in the buffer, so the shuffle puts any
+    #   dealt cards back and the top is moved back to the last card.
     def shuffle_deck(self):
-        shuffle(self.deck)
+        self._rng.shuffle(self.deck)
+        self.top = NUM_CARDS
 
-    # returns a card from the deck and removes it
+    # returns the id of the top card and moves the top of the deck
+    #   down by one. The card stays in the buffer but can't be dealt again.
     def deal_card(self):
-        return self.deck.pop()
+        self.top -= 1
+        return self._mv[self.top]
 
 class PlayBlackjack:
     '''The PlayBlackjack class is used to handle the flow of blackjack.
         It contains the deck used in the game, the hand for the player,
-        and the hand for the dealer.'''
-    def __init__(self):
+        the hand for the dealer, and whether the game runs in fast mode.
+        In fast mode the dealer draws without pausing between cards.'''
+    def __init__(self, fast=False):
+        self.fast = fast
         self.gameDeck = Deck()
         self.playerHand = Hand()
         self.dealerHand = Hand()
 
+    # prepares the game for another round by returning all cards
+    #   to the deck and emptying both hands
+    def new_round(self):
+        self.gameDeck.reset()
+        self.playerHand.reset()
+        self.dealerHand.reset()
+
     # start the game by dealing appropriately and checking if
     #   there is an immediate blackjack. If so, we return a
     #   non-zero value.
@@ -135,7 +221,7 @@ class PlayBlackjack:
         # check the value (or hard value if there's an ace)
         #   for a blackjack. If so, we return a non-zero
         #   value and proceed appropriately.
-        PVal = self.playerHand.get_value()[1]
+        PVal = self.playerHand.hard_value()
         if PVal == BLACKJACK_VAL:
             print("Blackjack! Wait for dealer...")
             return BLACKJACK
@@ -153,7 +239,7 @@ class PlayBlackjack:
         # check the value (or hard value if there's an ace)
         #   for a blackjack or a bust. If either, we return
         #   a non-zero value.
-        PVal = self.playerHand.get_value()[1]
+        PVal = self.playerHand.hard_value()
         if PVal > BLACKJACK_VAL:
             return PLAYER_BUSTED
         elif PVal == BLACKJACK_VAL:
@@ -168,9 +254,12 @@ class PlayBlackjack:
     #   with the hard value will cause the dealer to bust.
     def stand(self):
         print("Dealer getting cards...")
-        while self.dealerHand.get_value()[1] < 17:
-            self.dealerHand.add_card(self.gameDeck.deal_card())
-            time.sleep(2)
+        drawn = draw_until_17(self.gameDeck, self.dealerHand.value, self.dealerHand.numAce)
+        # show the drawn cards one at a time
+        for card in drawn:
+            self.dealerHand.add_card(card)
+            if not self.fast:
+                time.sleep(2)
             self.print_status()
             print()
 
@@ -179,85 +268,113 @@ class PlayBlackjack:
     def print_status(self):
         softDVal, DVal = self.dealerHand.get_value()
         softPVal, PVal = self.playerHand.get_value()
-        if softDVal:
-            print("Dealer Val: ", softDVal, "/", DVal)
-        else:
-            print("Dealer Val: ", DVal)
-        print("Dealer Cards: ", self.dealerHand.get_hand())
-        if softPVal:
-            print("Player Val: ", softPVal, "/", PVal)
-        else:
-            print("Player Val: ", PVal)
-        print("Player Cards: ", self.playerHand.get_hand())
+        DText = f"{softDVal} / {DVal}" if softDVal else DVal
+        PText = f"{softPVal} / {PVal}" if softPVal else PVal
+        # build the whole status first and write it out at once
+        sys.stdout.write(f"Dealer Val:  {DText}\n"
+                         f"Dealer Cards:  {self.dealerHand.get_hand()}\n"
+                         f"Player Val:  {PText}\n"
+                         f"Player Cards:  {self.playerHand.get_hand()}\n")
 
     # checks the status of the game. return WIN and LOSE as necessary.
+    #   The message and result are looked up in OUTCOMES.
     def check_status(self):
-        softDval, DVal = self.dealerHand.get_value()
-        softPVal, PVal = self.playerHand.get_value()
-        # player is busted, dealer score doesn't matter
-        if PVal > BLACKJACK_VAL:
-            print("Player Busted! You lose!")
-            return LOSE
-        # player is good but dealer busts
-        elif DVal > BLACKJACK_VAL:
-            print("Dealer Busted! You win!")
-            return WIN
-        # player and dealer are good, but tied
-        #   includes case of PVal = DVal = BLACKJACK_VAL
-        elif PVal == DVal:
-            print("Tie!")
-            return TIE
-        # player and dealer are good, and player has
-        #   a blackjack while dealer doesn't
-        elif PVal == BLACKJACK_VAL:
-            print("Blackjack! You win!")
-            return WIN
-        # player has higher score than dealer
-        elif PVal > DVal:
-            print("Player value higher! You win!")
-            return WIN
-        # player has lower score than dealer
-        elif PVal < DVal:
-            print("Dealer value higher! You lose!")
-            return LOSE
+        DVal = self.dealerHand.hard_value()
+        PVal = self.playerHand.hard_value()
+        compare = (PVal > DVal) * (1 + (PVal == BLACKJACK_VAL)) - (PVal < DVal)
+        message, result = OUTCOMES[PVal > BLACKJACK_VAL, DVal > BLACKJACK_VAL, compare]
+        print(message)
+        return result
+
+# simulates n_games rounds at once, in which the player stands on the
+#   first two cards and the dealer draws until DEALER_STAND_VAL. Each
+#   step of the Fisher-Yates shuffle swaps one column across all decks,
+#   and the hands are scored with array operations over every game, so
+#   this needs NumPy (which the game itself doesn't).
+# Returns the number of rounds won, tied, and lost by the player.
+def simulate(n_games, seed=None):
+    import numpy as np
+
+    # shuffle a deck per game
+    rng = np.random.default_rng(seed)
+    decks = np.broadcast_to(np.arange(NUM_CARDS, dtype=np.int8), (n_games, NUM_CARDS)).copy()
+    rows = np.arange(n_games)
+    for i in range(NUM_CARDS - 1, 0, -1):
+        j = rng.integers(0, i + 1, size=n_games)
+        swapped = decks[rows, j]
+        decks[rows, j] = decks[:, i]
+        decks[:, i] = swapped
+
+    cardValue = np.frombuffer(CARD_VALUE, dtype=np.uint8).astype(np.int16)
+    cardIsAce = np.frombuffer(CARD_IS_ACE, dtype=np.uint8).astype(np.int16)
+
+    # deal the first two cards to the player and the third to the dealer
+    player = hard_value(cardValue[decks[:, :2]].sum(axis=1),
+                        cardIsAce[decks[:, :2]].sum(axis=1))
+    dealerValue = cardValue[decks[:, 2]]
+    dealerAces = cardIsAce[decks[:, 2]]
+    dealer = hard_value(dealerValue, dealerAces)
+
+    # dealers keep drawing the next card of their deck until 17 or above
+    nextCard = 3
+    drawing = dealer < DEALER_STAND_VAL
+    while drawing.any():
+        cards = decks[drawing, nextCard]
+        dealerValue[drawing] += cardValue[cards]
+        dealerAces[drawing] += cardIsAce[cards]
+        dealer = hard_value(dealerValue, dealerAces)
+        drawing = dealer < DEALER_STAND_VAL
+        nextCard += 1
+
+    # two cards can't bust the player, so only the dealer can bust
+    dealerBusted = dealer > BLACKJACK_VAL
+    won = int(np.count_nonzero(dealerBusted | (player > dealer)))
+    tied = int(np.count_nonzero(~dealerBusted & (player == dealer)))
+    return won, tied, n_games - won - tied
+
+# asks the player to hit or stand until a valid answer is given,
+#   and returns it ('h' or 's')
+def prompt_action():
+    while True:
+        response = input('Hit or stay? (Hit = \'h\', Stand = \'s\')')
+        print()
+        if response == 'h' or response == 's':
+            return response
+        print("Invalid answer. Please select again.")
 
 if __name__ == '__main__':
     # determine if player wants to play game
     play_game = True
     win, tie, lose = 0, 0, 0
 
+    # initialize game of blackjack. The same game is reused every round
+    game = PlayBlackjack(fast='--fast' in sys.argv[1:])
+
     while  play_game:
-        # initialize game of blackjack
-        game = PlayBlackjack()
+        game.new_round()
         status = game.start()
         # if there is an immediate blackjack, we skip to the part where
         #   dealer draws until the value is 17 or over
         if status == BLACKJACK:
-            response = 's'
             game.stand()
         # otherwise, proceed as normal
         else:
-            response = 'h'
-
-        while (response == 'h'):
-            response = input('Hit or stay? (Hit = \'h\', Stand = \'s\')')
-            print()
-            # if player hits, check for a bust or blackjack.
-            if response == 'h':
-                status = game.hit()
-                # if bust, game is over.
-                if status == PLAYER_BUSTED:
-                    break
-                # if blackjack, dealer draws until value is 17 or over
-                elif status == BLACKJACK:
+            while True:
+                action = prompt_action()
+                # if player hits, check for a bust or blackjack.
+                if action == 'h':
+                    status = game.hit()
+                    # if bust, game is over.
+                    if status == PLAYER_BUSTED:
+                        break
+                    # if blackjack, dealer draws until value is 17 or over
+                    elif status == BLACKJACK:
+                        game.stand()
+                        break
+                # if player stands, act accordingly
+                else:
                     game.stand()
                     break
-            # if player stands, act accordingly
-            elif response == 's':
-                game.stand()
-            else:
-                print("Invalid answer. Please select again.")
-                response = 'h'
 
         # output the game status
         gamestatus = game.check_status()